@@ -1,11 +1,18 @@
 import can
 import time 
 import asyncio
+import struct
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 
 from dataclasses import dataclass
 
+# Blocking bus.send() calls run here; a single worker keeps frames in send order
+_send_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="can_send")
+# Four unsigned 16-bit values, little endian, as packed into one 8-byte data frame
+_uint16x4 = struct.Struct('<4H')
+
 @dataclass
 class CanData:
     node_id: int
@@ -201,12 +208,7 @@ class CanOpen:
     
     @staticmethod     
     def generate_uint_16bit_msg(val1, val2, val3, val4):
-        sig_1 = val1.to_bytes(2, byteorder='little', signed=False)
-        sig_2 = val2.to_bytes(2, byteorder='little', signed=False)
-        sig_3 = val3.to_bytes(2, byteorder='little', signed=False)
-        sig_4 = val4.to_bytes(2, byteorder='little', signed=False)
-
-        msg_bytes = sig_1 + sig_2 + sig_3 + sig_4  # Combine all into one bytes object
+        msg_bytes = _uint16x4.pack(val1, val2, val3, val4)  # 8 bytes, little endian
         msg = list(msg_bytes)  # Convert to flat list of ints
 
         return msg
@@ -221,7 +223,7 @@ class CanOpen:
         else: 
             pump_speed = pump_speed
 
-        raw_out1 = pump_speed* 655
+        raw_out1 = int(pump_speed * 655)  # PID output is a float; the frame needs uint16
 
         if pump_on == 1:
             raw_out2 = 65535
@@ -281,7 +283,7 @@ class CanOpen:
         
     @staticmethod
     async def send_can_message(can_bus: can.Bus, can_id: int, data: List[int]):
-        """nonblocking can_sender (hopefully)
+        """nonblocking can_sender, bus.send() runs on a worker thread so a slow driver can't stall the event loop
 
         Args:
             can_bus (can.Bus): can bus
@@ -296,12 +298,24 @@ class CanOpen:
 
         msg = can.Message(arbitration_id=can_id, data=data, is_extended_id=False)
 
+        loop = asyncio.get_running_loop()
+
         try:
-            can_bus.send(msg)
+            await loop.run_in_executor(_send_executor, can_bus.send, msg)
             print(f"[SEND] Sent CAN message: COB-ID=0x{can_id:X}, Data={data}")
         except can.CanError as e:
             print(f"[ERROR] Failed to send CAN message: {e}")
 
+    @staticmethod
+    def shutdown_bus(can_bus: can.Bus):
+        """shut the bus down on the send worker, after any send already in flight, so
+        shutdown() never runs concurrently with bus.send()
+
+        Args:
+            can_bus (can.Bus): can bus
+        """
+        _send_executor.submit(can_bus.shutdown).result()
+
 
 
 
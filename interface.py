@@ -11,22 +11,29 @@ from PySide6.QtWidgets import (
     QPushButton, QDoubleSpinBox
 )
 from PySide6.QtCore import Qt, QTimer, QTime
-from PySide6.QtGui import QFont
-from collections import deque
+from PySide6.QtGui import QFont, QIntValidator
 import csv
+import queue
+import threading
 from datetime import datetime
 from pid_controller import PIDController
 import pyqtgraph as pg
+import numpy as np
+import qasync
 
-from pglive.kwargs import Axis
-from pglive.sources.live_plot_widget import LivePlotWidget
-from pglive.sources.live_plot import LiveLinePlot
-from pglive.sources.data_connector import DataConnector
-from pglive.sources.live_axis_range import LiveAxisRange
+try:
+    import OpenGL  # PyOpenGL is optional; only used to GPU-render the plots
+    has_opengl = True
+except ImportError:
+    has_opengl = False
+
+# Width-1 lines without antialiasing stay on Qt's fast raster path
+pg.setConfigOptions(antialias=False, useOpenGL=has_opengl, enableExperimental=has_opengl)
 
 
 history_len = 300  # example buffer length
 
+
 class PumpControlWidget(QWidget):
     def __init__(self):
         super().__init__()
@@ -41,9 +48,8 @@ class PumpControlWidget(QWidget):
         self.speed_entry = QLineEdit("0")
         self.speed_entry.setFixedWidth(50)
         self.speed_entry.setAlignment(Qt.AlignmentFlag.AlignCenter)
-
-        self.output_label = QLabel("PID Output: -- %")
-        self.output_label.setStyleSheet("font-size: 14px; color: #2e8b57;")
+        # editingFinished only fires for acceptable input, i.e. an int in 0..100
+        self.speed_entry.setValidator(QIntValidator(0, 100, self.speed_entry))
 
         self.speed_slider.valueChanged.connect(self.update_entry)
         self.speed_entry.editingFinished.connect(self.update_slider)
@@ -64,24 +70,25 @@ class PumpControlWidget(QWidget):
         form_layout.addWidget(self.speed_slider, 1, 1)
         form_layout.addWidget(self.speed_entry, 1, 2)
 
-        form_layout.addWidget(self.output_label, 2, 0, 1, 3)
-
         group.setLayout(form_layout)
         layout.addWidget(group)
         layout.addStretch(1)
 
         self.setLayout(layout)
 
+    # Signals are blocked during the cross-updates so the slider and entry don't
+    # bounce valueChanged/editingFinished back and forth
     def update_entry(self, val):
-        self.speed_entry.setText(str(val))
+        text = str(val)
+        if self.speed_entry.text() != text:
+            self.speed_entry.blockSignals(True)
+            self.speed_entry.setText(text)
+            self.speed_entry.blockSignals(False)
 
     def update_slider(self):
-        try:
-            val = int(self.speed_entry.text())
-            if 0 <= val <= 100:
-                self.speed_slider.setValue(val)
-        except ValueError:
-            pass
+        self.speed_slider.blockSignals(True)
+        self.speed_slider.setValue(int(self.speed_entry.text()))
+        self.speed_slider.blockSignals(False)
 
     def get_state(self):
         return int(self.pump_on_checkbox.isChecked()), self.speed_slider.value()
@@ -93,63 +100,92 @@ class PyqtgraphPlotWidget(QWidget):
 
         plot_layout = QVBoxLayout()
 
-        # Initialize data storage attributes for plotting
-        self.pressure_data_buffers = [deque([0.0]*history_len, maxlen=history_len) for _ in range(3)]
-        self.temperature_data_buffers = [deque([0.0]*history_len, maxlen=history_len) for _ in range(2)]
-        # Store data connectors to push data later
-        self.pressure_connectors = []
-        self.temperature_connectors = []
-
+        # Preallocated ring buffers (one row per sensor); the counts are total samples
+        # written, so the write index is count % history_len. Every sample is written
+        # twice, history_len apart, so the latest window is always one contiguous slice.
+        self.pressure_history = np.zeros((3, 2 * history_len))
+        self.temperature_history = np.zeros((2, 2 * history_len))
+        self.pressure_count = 0
+        self.temperature_count = 0
+        # Counts at the last redraw; a group is only redrawn when new samples arrived
+        self._pressure_drawn = 0
+        self._temperature_drawn = 0
+
+        # One x axis shared by every curve: sample offset from the newest sample (0).
+        # The 0x181/0x182 stream rates aren't configured here, so no seconds scale.
+        self.sample_axis = np.arange(history_len) - (history_len - 1)
 
         # Pressure plots - one per sensor
         self.pressure_plots = []
+        self.pressure_curves = []
         for i, title in enumerate(["PT1401", "PT1402", "PT1403"]):
-            widget = LivePlotWidget(
-                title=title,
-                x_range_controller=LiveAxisRange(roll_on_tick=30),
-                y_range_controller=LiveAxisRange(fixed_range=[0, 100])  # adjust range as needed
-            )
-            plot = LiveLinePlot(pen='g')
-            widget.addItem(plot)
+            widget = pg.PlotWidget(title=title)
+            widget.setXRange(self.sample_axis[0], self.sample_axis[-1], padding=0)
+            widget.setLabel('bottom', "Samples")
+            widget.setYRange(0, 100)  # adjust range as needed
+            widget.setMouseEnabled(x=False, y=False)  # fixed live view, no pan/zoom
+            # Draw at most ~one peak pair per pixel column, only inside the x range
+            widget.setDownsampling(auto=True, mode='peak')
+            widget.setClipToView(True)
+            curve = widget.plot(pen=pg.mkPen('g', width=1, cosmetic=True))
             plot_layout.addWidget(widget)
             self.pressure_plots.append(widget)
-
-            # DataConnector manages the data feeding
-            connector = DataConnector(plot, max_points=history_len, update_rate=30)
-            self.pressure_connectors.append(connector)
+            self.pressure_curves.append(curve)
 
         # Temperature combined plot (two curves)
-        temp_widget = LivePlotWidget(
-            title="Temperatures",
-            x_range_controller=LiveAxisRange(roll_on_tick=30),
-            y_range_controller=LiveAxisRange(fixed_range=[-20, 120])  # example range for temp
-        )
-        temp_curve1 = LiveLinePlot(pen='r')
-        temp_curve2 = LiveLinePlot(pen='g')
-        temp_widget.addItem(temp_curve1)
-        temp_widget.addItem(temp_curve2)
-        plot_layout.addWidget(temp_widget)
-
-        self.temperature_connectors = [
-            DataConnector(temp_curve1, max_points=history_len, update_rate=30),
-            DataConnector(temp_curve2, max_points=history_len, update_rate=30),
+        temp_widget = pg.PlotWidget(title="Temperatures")
+        temp_widget.setXRange(self.sample_axis[0], self.sample_axis[-1], padding=0)
+        temp_widget.setLabel('bottom', "Samples")
+        temp_widget.setYRange(-20, 120)  # example range for temp
+        temp_widget.setMouseEnabled(x=False, y=False)
+        temp_widget.setDownsampling(auto=True, mode='peak')
+        temp_widget.setClipToView(True)
+        self.temperature_curves = [
+            temp_widget.plot(pen=pg.mkPen('r', width=1, cosmetic=True)),
+            temp_widget.plot(pen=pg.mkPen('g', width=1, cosmetic=True)),
         ]
+        plot_layout.addWidget(temp_widget)
 
         self.layout.addLayout(plot_layout)
 
-    def update_plot(self):
-        # This method is called by a QTimer to update the plots.
-        # It takes the latest value from the internal data buffers and pushes it to the connectors.
-
-        # Append new pressure data points
-        for i, connector in enumerate(self.pressure_connectors):
-            if i < len(self.pressure_data_buffers):
-                connector.cb_append_data_point(self.pressure_data_buffers[i][-1]) # Use cb_append_data_point for single point
+    @staticmethod
+    def _ring_write(history, count, values):
+        index = count % history_len
+        history[:, index] = values
+        history[:, index + history_len] = values
+
+    def append_pressures(self, pressures):
+        self._ring_write(self.pressure_history, self.pressure_count, pressures)
+        self.pressure_count += 1
+
+    def append_temperatures(self, temperatures):
+        self._ring_write(self.temperature_history, self.temperature_count, temperatures)
+        self.temperature_count += 1
+
+    def _set_curves(self, curves, history, count):
+        # Oldest-first window sliced from the mirrored ring. pyqtgraph keeps the array it
+        # is given and repaints from it later, while new samples keep overwriting the
+        # ring, so each curve gets its own snapshot of the window.
+        start = count % history_len
+        window = history[:, start:start + history_len]
+        # Samples are decoded CAN values and never NaN/inf, so skip pyqtgraph's finite scan
+        for curve, y in zip(curves, window):
+            curve.setData(self.sample_axis, y.copy(), connect='all', skipFiniteCheck=True)
 
-        # Append new temperature data points if available
-        for i, connector in enumerate(self.temperature_connectors):
-            if i < len(self.temperature_data_buffers):
-                connector.cb_append_data_point(self.temperature_data_buffers[i][-1]) # Use cb_append_data_point for single point
+    def update_plot(self):
+        # This method is called by a QTimer to update the plots. The redraw rate is
+        # independent of the CAN data rate: samples are buffered as they arrive and
+        # the window is redrawn here only for groups that received new samples.
+        # While hidden or minimised nothing is drawn; the counts stay unequal, so
+        # the first tick after the window is shown again catches up.
+        if not self.isVisible() or self.window().isMinimized():
+            return
+        if self.pressure_count != self._pressure_drawn:
+            self._set_curves(self.pressure_curves, self.pressure_history, self.pressure_count)
+            self._pressure_drawn = self.pressure_count
+        if self.temperature_count != self._temperature_drawn:
+            self._set_curves(self.temperature_curves, self.temperature_history, self.temperature_count)
+            self._temperature_drawn = self.temperature_count
 
 class SensorDisplayWidget(QWidget):
     def __init__(self):
@@ -157,12 +193,20 @@ class SensorDisplayWidget(QWidget):
         layout = QVBoxLayout()
         self.pressure_labels = []
         self.temperature_labels = []
+        # Fixed "name: " prefixes and the text currently shown, so updates only format
+        # the value and skip setText when the displayed string would not change
+        self.pressure_prefixes = []
+        self.temperature_prefixes = []
+        self._pressure_texts = []
+        self._temperature_texts = []
 
         # Feedback labels
         self.pump_feedback_label = QLabel("Pump Feedback: -- %")
-        self.flow_feedback_label = QLabel("Flow Rate: -- L/min")
+        self.flow_feedback_label = QLabel("Flow Rate: -- kg/h")
         self.pump_feedback_label.setStyleSheet("font-size: 14px;")
         self.flow_feedback_label.setStyleSheet("font-size: 14px;")
+        self._pump_feedback_text = self.pump_feedback_label.text()
+        self._flow_feedback_text = self.flow_feedback_label.text()
 
         layout.addWidget(self.pump_feedback_label)
         layout.addWidget(self.flow_feedback_label)
@@ -178,6 +222,8 @@ class SensorDisplayWidget(QWidget):
             label.setAlignment(Qt.AlignmentFlag.AlignLeft)
             label.setStyleSheet("font-size: 14px;")
             self.pressure_labels.append(label)
+            self.pressure_prefixes.append(f"{name}: ")
+            self._pressure_texts.append(label.text())
             layout.addWidget(label)
 
         layout.addSpacing(10)  # Spacer between sections
@@ -193,23 +239,37 @@ class SensorDisplayWidget(QWidget):
             label.setAlignment(Qt.AlignmentFlag.AlignLeft)
             label.setStyleSheet("font-size: 14px;")
             self.temperature_labels.append(label)
+            self.temperature_prefixes.append(f"{name}: ")
+            self._temperature_texts.append(label.text())
             layout.addWidget(label)
 
         layout.addStretch()
         self.setLayout(layout)
 
     def update_feedback(self, pump_feedback, flow_rate):
-        self.pump_feedback_label.setText(f"Pump Feedback: {pump_feedback:.1f} %")
-        self.flow_feedback_label.setText(f"Flow Rate: {flow_rate:.1f} L/min")
+        pump_text = f"Pump Feedback: {pump_feedback:.1f} %"
+        if pump_text != self._pump_feedback_text:
+            self.pump_feedback_label.setText(pump_text)
+            self._pump_feedback_text = pump_text
+        flow_text = f"Flow Rate: {flow_rate:.1f} kg/h"
+        if flow_text != self._flow_feedback_text:
+            self.flow_feedback_label.setText(flow_text)
+            self._flow_feedback_text = flow_text
 
 
     def update_pressures(self, pressures):
         for i, pressure in enumerate(pressures):
-            self.pressure_labels[i].setText(f"PT140{i+1:02d}: {pressure:.1f} psi")
+            text = f"{self.pressure_prefixes[i]}{pressure:.1f} psi"
+            if text != self._pressure_texts[i]:
+                self.pressure_labels[i].setText(text)
+                self._pressure_texts[i] = text
 
     def update_temperatures(self, temperatures):
         for i, temp in enumerate(temperatures):
-            self.temperature_labels[i].setText(f"T0{i+1}: {temp:.1f} °C")
+            text = f"{self.temperature_prefixes[i]}{temp:.1f} °C"
+            if text != self._temperature_texts[i]:
+                self.temperature_labels[i].setText(text)
+                self._temperature_texts[i] = text
 
 
 class PIDControlWidget(QWidget):
@@ -222,6 +282,7 @@ class PIDControlWidget(QWidget):
         self.setLayout(layout)
         self.output_label = QLabel("PID Output: -- %")
         self.output_label.setStyleSheet("font-size: 14px;")
+        self._output_text = self.output_label.text()
         layout.addWidget(QLabel("PID Controller"))
 
         layout.addWidget(self.output_label)
@@ -233,6 +294,9 @@ class PIDControlWidget(QWidget):
 
         for spinbox in [self.kp_input, self.ki_input, self.kd_input, self.setpoint_input]:
             spinbox.setRange(0, 1000); spinbox.setDecimals(2)
+            # Push edits into the controller as they happen instead of polling every tick
+            spinbox.valueChanged.connect(self.update_pid_params)
+        self.update_pid_params()
 
         layout.addWidget(QLabel("Kp")); layout.addWidget(self.kp_input)
         layout.addWidget(QLabel("Ki")); layout.addWidget(self.ki_input)
@@ -264,18 +328,23 @@ class PIDControlWidget(QWidget):
         self.controller.set_setpoint(setpoint)
 
     def compute_output(self, measured_value):
-        self.update_pid_params()
         if self.pid_enabled:
             output = self.controller.calculate(measured_value)
-            self.output_label.setText(f"PID Output: {output:.1f} %")
+            self.set_output_text(f"PID Output: {output:.1f} %")
             return output
         else:
-            self.output_label.setText("PID Output: -- %")
+            self.set_output_text("PID Output: -- %")
             return None
 
+    def set_output_text(self, text):
+        # Called every pump tick; only touch the label when the shown text changes
+        if text != self._output_text:
+            self.output_label.setText(text)
+            self._output_text = text
+
 
 class MainWindow(QWidget):
-    def __init__(self, bus, queue):
+    def __init__(self, queue):
         super().__init__()
         self.setStyleSheet("""
             QWidget {
@@ -308,7 +377,7 @@ class MainWindow(QWidget):
 
         self.setWindowTitle("Instrumentation Dashboard")
         self.setMinimumSize(1200, 800)
-        self.bus = bus
+        self.bus = None  # opened by toggle_can_connection
         self.queue = queue
 
         self.pump_control = PumpControlWidget()
@@ -316,10 +385,17 @@ class MainWindow(QWidget):
         self.sensor_display = SensorDisplayWidget()
         self.pid_control = PIDControlWidget()
 
-        # Logging control
+        # Logging control; rows are written to disk by a background thread
         self.logging = False
-        self.log_file = None
-        self.csv_writer = None
+        self.log_queue = None
+        self.log_thread = None
+        self.log_error = None  # set by the writer thread if writing the file fails
+        self._log_stop_sent = False  # stop sentinel already queued for the writer thread
+        self._ts_second = None  # whole second the cached timestamp prefix belongs to
+        self._ts_prefix = ""
+        # Last (pump_on, speed) command and its encoded CAN payload
+        self._last_command = None
+        self._last_payload = None
         self.can_connected = False
 
 
@@ -350,30 +426,27 @@ class MainWindow(QWidget):
         layout.addWidget(self.status_bar, alignment=Qt.AlignmentFlag.AlignBottom)
         self.setLayout(layout)
 
-        self.bus = None
         self.connect_button = QPushButton("Connect CAN")
         self.connect_button.clicked.connect(self.toggle_can_connection)
         side_panel.addWidget(self.connect_button)
 
 
+        # Plot redraw runs slower than the CAN data rate; samples are buffered in between
+        self.plot_refresh_ms = 200
         self.timer = QTimer()
         self.timer.timeout.connect(self.update_plot_ui) # Renamed to avoid confusion
-        self.timer.start(100) # Update plot UI every 100ms
-
-        # These tasks are started in main_async, no need to start here again
-        # asyncio.create_task(self.consumer_task())
-        # asyncio.create_task(self.pump_sender_task())
+        self.timer.start(self.plot_refresh_ms)
 
+        # Latest readings as plain floats; they feed the PID and the log rows
         self.last_pressures = [0.0, 0.0, 0.0]
         self.last_temps = [0.0, 0.0]
+        self.last_feedback = None  # dict from CanOpen.parse_i_tpdo
 
     def toggle_can_connection(self):
         if not self.can_connected:
             try:
                 self.bus = can.interface.Bus(channel="PCAN_USBBUS1", interface="pcan", bitrate=500000)
                 CanOpen.start_listener(self.bus, resolution=16, queue=self.queue)
-                # Ensure pump_sender_task is running only if connected
-                # asyncio.create_task(self.pump_sender_task()) # This will be started once in main_async
                 self.status_bar.setText("Status: CAN Connected")
                 self.connect_button.setText("Disconnect CAN")
                 self.can_connected = True
@@ -383,7 +456,7 @@ class MainWindow(QWidget):
         else:
             try:
                 if self.bus:
-                    self.bus.shutdown()
+                    CanOpen.shutdown_bus(self.bus)
                 self.bus = None
                 self.can_connected = False
                 self.connect_button.setText("Connect CAN")
@@ -393,6 +466,13 @@ class MainWindow(QWidget):
 
     def toggle_logging(self):
         if not self.logging:
+            # A previous writer that did not exit yet still owns its file; retry its
+            # shutdown and don't start a second writer next to it
+            if not self.stop_logging():
+                QMessageBox.warning(self, "Logging Busy",
+                                    "The previous log file is still being written. Try again shortly.")
+                return
+
             filename = self.log_filename_entry.text().strip()
             if not filename:
                 QMessageBox.warning(self, "Missing Filename", "Please enter a log filename.")
@@ -402,12 +482,17 @@ class MainWindow(QWidget):
                 filename += ".csv"
 
             try:
-                self.log_file = open(filename, 'w', newline='')
-                self.csv_writer = csv.writer(self.log_file)
-                self.csv_writer.writerow([
+                log_file = open(filename, 'w', newline='', buffering=1 << 16) # writer thread flushes ~1 Hz
+                csv.writer(log_file).writerow([
                     "Timestamp", "PT1401 (psi)", "PT1402 (psi)", "PT1403 (psi)",
                     "T01 (°C)", "T02 (°C)", "Pump On", "Pump Speed (%)", "Pump Speed (RPM)"
                 ])
+                self.log_queue = queue.Queue(maxsize=1024)
+                self.log_error = None
+                self._log_stop_sent = False
+                self.log_thread = threading.Thread(
+                    target=self.log_writer, args=(log_file, self.log_queue), daemon=True)
+                self.log_thread.start()
                 self.logging = True
                 self.log_button.setText("Stop Logging")
                 self.log_filename_entry.setEnabled(False)
@@ -415,108 +500,203 @@ class MainWindow(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to open file: {e}")
         else:
-            # Stop logging
-            self.logging = False
-            if self.log_file:
-                self.log_file.close()
-                self.log_file = None
-            self.csv_writer = None
+            self.stop_logging()
             self.log_button.setText("Start Logging")
             self.log_filename_entry.setEnabled(True)
             print("Logging stopped.")
 
+    def stop_logging(self):
+        # The writer thread drains what is queued, flushes and closes the file. Waiting
+        # for it is bounded so a writer stuck on a stalled disk can't freeze the GUI; in
+        # that case the thread is kept and False is returned, and the next call retries.
+        self.logging = False
+        if self.log_thread is None:
+            return True
+        # A writer that died on a write error would never take the sentinel
+        if self.log_thread.is_alive() and not self._log_stop_sent:
+            try:
+                self.log_queue.put(None, timeout=1.0)
+                self._log_stop_sent = True
+            except queue.Full:
+                pass
+        self.log_thread.join(timeout=2.0)
+        if self.log_thread.is_alive():
+            self.status_bar.setText("Status: Log writer not responding, log file still open")
+            return False
+        self.log_thread = None
+        self.log_queue = None
+        return True
+
+    def logging_failed(self):
+        # Called from the GUI loop once the writer thread has reported an error
+        error = self.log_error
+        self.stop_logging()
+        self.log_button.setText("Start Logging")
+        self.log_filename_entry.setEnabled(True)
+        self.status_bar.setText(f"Status: Logging stopped, write failed: {error}")
+
+    def log_writer(self, log_file, log_queue):
+        # Runs on its own thread: writes queued rows in batches, flushes about once a
+        # second and closes the file once the None sentinel arrives. A write error ends
+        # the thread; it is stored in log_error for the GUI side to report.
+        try:
+            writer = csv.writer(log_file)
+            last_flush = time.monotonic()
+            running = True
+            while running:
+                rows = [log_queue.get()]
+                while True:
+                    try:
+                        rows.append(log_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if rows[-1] is None:  # the stop sentinel is always the last row queued
+                    rows.pop()
+                    running = False
+                writer.writerows(rows)
+                now = time.monotonic()
+                if not running or now - last_flush >= 1.0:
+                    log_file.flush()
+                    last_flush = now
+        except Exception as e:
+            self.log_error = e
+        finally:
+            try:
+                log_file.close()
+            except Exception:
+                pass  # closing flushes too; the original error is already recorded
+
+
+    def log_timestamp(self):
+        # Same format as datetime.now().isoformat(), but the date/time part is only
+        # rebuilt once per second
+        now = time.time()
+        second = int(now)
+        if second != self._ts_second:
+            self._ts_second = second
+            self._ts_prefix = datetime.fromtimestamp(second).isoformat()
+        return f"{self._ts_prefix}.{int((now - second) * 1e6):06d}"
 
     async def consumer_task(self):
         while True:
-            data: CanData = await self.queue.get()
-            timestamp = datetime.now().isoformat()
-
-            if data.voltage is not None:
-                scaled_pressures = [
-                    data.voltage[0] * 30.0,
-                    data.voltage[1] * 60.0,
-                    data.voltage[2] * 60.0
-                ]
-                # Append to the deque buffers in plot_canvas directly
-                for i in range(len(scaled_pressures)):
-                    self.plot_canvas.pressure_data_buffers[i].append(scaled_pressures[i])
+            # Wait for one frame, then drain everything already queued so a burst of
+            # frames costs one wake-up instead of one per frame
+            batch: List[CanData] = [await self.queue.get()]
+            while True:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
 
-                self.last_pressures = scaled_pressures
-                self.sensor_display.update_pressures(scaled_pressures)
+            # Only store readings here; the labels are refreshed by update_plot_ui
+            for data in batch:
+                if data.voltage is not None:
+                    self.last_pressures = [
+                        data.voltage[0] * 30.0,
+                        data.voltage[1] * 60.0,
+                        data.voltage[2] * 60.0
+                    ]
+                    self.plot_canvas.append_pressures(self.last_pressures)
 
-            elif data.temperature is not None:
-                if data.node_id == 0x182:
-                    # Append to the deque buffers in plot_canvas directly
-                    if len(data.temperature) >= 2: # Ensure enough temperature data
-                        self.plot_canvas.temperature_data_buffers[0].append(data.temperature[0])
-                        self.plot_canvas.temperature_data_buffers[1].append(data.temperature[1])
-                        self.last_temps = data.temperature[:2]
-                        self.sensor_display.update_temperatures(data.temperature[:2])
+                elif data.temperature is not None:
+                    if data.node_id == 0x182:
+                        if len(data.temperature) >= 2: # Ensure enough temperature data
+                            self.last_temps = data.temperature[:2]
+                            self.plot_canvas.append_temperatures(self.last_temps)
 
-            elif data.current_4_20mA is not None:
-                self.sensor_display.update_feedback(data.current_4_20mA[0], data.current_4_20mA[1])
+                elif data.current_4_20mA is not None:
+                    self.last_feedback = data.current_4_20mA
 
-            self.queue.task_done()
+            for _ in batch:
+                self.queue.task_done()
 
 
     async def pump_sender_task(self):
         while True:
             pump_on, manual_speed = self.pump_control.get_state()
-            measured_pressure = self.last_pressures[0] if hasattr(self, 'last_pressures') else 0.0
+            measured_pressure = self.last_pressures[0]
             pid_speed = self.pid_control.compute_output(measured_pressure)
             speed = pid_speed if pid_speed is not None else manual_speed
 
-            raw1, raw2 = CanOpen.generate_outmm_msg(pump_on, speed)
-            data = CanOpen.generate_uint_16bit_msg(int(raw1), int(raw2), 0, 0)
-
             if self.can_connected and self.bus:
+                # Only encode the command when there is a bus to send it on and it changed;
+                # the frame itself is still sent every tick
+                command = (pump_on, speed)
+                if command != self._last_command:
+                    raw1, raw2 = CanOpen.generate_outmm_msg(pump_on, speed)
+                    self._last_payload = CanOpen.generate_uint_16bit_msg(raw1, raw2, 0, 0)
+                    self._last_command = command
                 try:
-                    await CanOpen.send_can_message(self.bus, 0x600, data)
+                    await CanOpen.send_can_message(self.bus, 0x600, self._last_payload)
                 except Exception as e:
-                    self.status_bar.setText(f"CAN Send Error: {str(e)}")
-
-            if self.logging:
-                timestamp = datetime.now().isoformat()
+                    status = f"CAN Send Error: {str(e)}"
+                    if self.status_bar.text() != status: # same error repeats every tick
+                        self.status_bar.setText(status)
+
+            if self.logging and self.log_error is not None:
+                self.logging_failed()
+            elif self.logging:
+                timestamp = self.log_timestamp()
                 rpm = speed * 17.2 # Assuming a conversion factor
-                self.csv_writer.writerow([
-                    timestamp,
-                    *self.last_pressures,
-                    *self.last_temps,
-                    pump_on,
-                    speed,
-                    rpm
-                ])
-                self.log_file.flush() # Ensure data is written to disk
+                try:
+                    self.log_queue.put_nowait((
+                        timestamp,
+                        *self.last_pressures,
+                        *self.last_temps,
+                        pump_on,
+                        speed,
+                        rpm
+                    ))
+                except queue.Full:
+                    pass  # writer is behind; drop the row rather than stall the pump loop
 
             await asyncio.sleep(0.05) # Send pump commands at 20Hz
 
     def update_plot_ui(self): # Renamed this method
         self.plot_canvas.update_plot()
+        # Labels follow the redraw timer rather than the CAN frame rate. Each one
+        # keeps its "--" placeholder until the first reading of its kind arrives.
+        if self.plot_canvas.pressure_count:
+            self.sensor_display.update_pressures(self.last_pressures)
+        if self.plot_canvas.temperature_count:
+            self.sensor_display.update_temperatures(self.last_temps)
+        if self.last_feedback is not None:
+            self.sensor_display.update_feedback(
+                self.last_feedback["pump_percent"], self.last_feedback["flow_kg_per_h"])
 
     def closeEvent(self, event):
-        if self.log_file:
-            self.log_file.close()
-            self.log_file = None
+        self.stop_logging()
         if self.can_connected and self.bus:
-            self.bus.shutdown() # Ensure CAN bus is shut down
+            CanOpen.shutdown_bus(self.bus) # Ensure CAN bus is shut down
         event.accept()
 
 
-async def main_async():
-    queue = asyncio.Queue()
-
+def main():
     app = QApplication(sys.argv)
-    window = MainWindow(bus=None, queue=queue)
-    window.show()
+    # qasync runs asyncio on top of Qt's own event loop, so neither side polls the other
+    loop = qasync.QEventLoop(app)
+    asyncio.set_event_loop(loop)
+
+    with loop:
+        queue = asyncio.Queue()
+        window = MainWindow(queue=queue)
+        window.show()
+
+        # Start the async tasks; they run until the application quits
+        tasks = [
+            loop.create_task(window.consumer_task()),
+            loop.create_task(window.pump_sender_task()),
+        ]
 
-    # Start the async tasks
-    asyncio.create_task(window.consumer_task())
-    asyncio.create_task(window.pump_sender_task())
+        def cancel_tasks():
+            for task in tasks:
+                task.cancel()
 
-    # This loop keeps the Qt event loop and asyncio event loop running
-    while True:
-        await asyncio.sleep(0.01) # Small sleep to yield to other asyncio tasks
-        app.processEvents() # Process Qt events
+        app.aboutToQuit.connect(cancel_tasks)
+        loop.run_forever() # Returns when the last window is closed
+        # Let the cancellations finish (e.g. a send still awaiting the executor)
+        # before the loop is closed
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
 
 if __name__ == "__main__":
-    asyncio.run(main_async())
\ No newline at end of file
+    main()
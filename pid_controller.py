@@ -1,4 +1,7 @@
 class PIDController:
+    # Fixed attribute layout: no per-instance __dict__, faster attribute access in calculate()
+    __slots__ = ("kp", "ki", "kd", "setpoint", "prev_error", "integral")
+
     def __init__(self, kp=1.0, ki=0.0, kd=0.0, setpoint=0.0):
         self.kp = kp  
         self.ki = ki  
@@ -26,12 +29,13 @@ class PIDController:
         self.integral += error
         derivative = error - self.prev_error
 
+        # saturate() inlined: this runs on every pump command tick
         output = (
             self.kp * error
-            + PIDController.saturate(self.ki * self.integral, 0, 100)
-            + PIDController.saturate(self.kd * derivative, 0, 100)
+            + max(0, min(100, self.ki * self.integral))
+            + max(0, min(100, self.kd * derivative))
         )
 
         self.prev_error = error
-        return PIDController.saturate(output, 0, 100)
+        return max(0, min(100, output))
 